@@ -0,0 +1,131 @@
+"""
+Tablas de probabilidad condicional de la red de diagnóstico médico
+Compartidas por las versiones de pgmpy y PyMC
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba es opcional: sin él se usan las versiones de NumPy
+    njit = None
+
+# ======================
+# DEFINICIÓN DE LAS TABLAS
+# ======================
+
+# Orden de las variables (y de los ejes de la distribución conjunta)
+VARIABLES = ('PG', 'Gripe', 'Neumonia', 'Fiebre', 'Tos', 'Dolor_cabeza')
+
+ESTADOS = {
+    'PG': ['Alta', 'Media', 'Baja'],
+    'Gripe': ['Sí', 'No'],
+    'Neumonia': ['Sí', 'No'],
+    'Fiebre': ['Sí', 'No'],
+    'Tos': ['Sí', 'No'],
+    'Dolor_cabeza': ['Sí', 'No']
+}
+
+# Cada tabla tiene la variable en el primer eje y sus padres en los siguientes,
+# con los estados en el orden de ESTADOS (igual que TabularCPD.values).
+# Las probabilidades tienen un decimal, así que float32 es suficiente
+TIPO = np.float32
+
+P_PG = np.array([0.3, 0.4, 0.3], dtype=TIPO)  # (PG)
+
+P_GRIPE = np.array([[0.6, 0.4, 0.2],            # (Gripe, PG)
+                    [0.4, 0.6, 0.8]], dtype=TIPO)
+
+P_NEUMONIA = np.array([[0.7, 0.5, 0.3],         # (Neumonia, PG)
+                       [0.3, 0.5, 0.7]], dtype=TIPO)
+
+P_FIEBRE = np.array([[[0.9, 0.8],               # (Fiebre, Gripe, Neumonia)
+                      [0.7, 0.1]],
+                     [[0.1, 0.2],
+                      [0.3, 0.9]]], dtype=TIPO)
+
+P_TOS = np.array([[0.8, 0.2],                   # (Tos, Neumonia)
+                  [0.2, 0.8]], dtype=TIPO)
+
+P_DOLOR = np.array([[0.7, 0.3],                 # (Dolor_cabeza, Gripe)
+                    [0.3, 0.7]], dtype=TIPO)
+
+# Índice de cada estado: {variable: (eje, {estado: índice})}
+EJES = {
+    nombre: (eje, {estado: idx for idx, estado in enumerate(ESTADOS[nombre])})
+    for eje, nombre in enumerate(VARIABLES)
+}
+
+# ======================
+# NÚCLEOS NUMÉRICOS
+# ======================
+
+def _producto_cpts(p_pg, p_gripe, p_neumonia, p_fiebre, p_tos, p_dolor):
+    """Producto de las CPTs celda por celda (versión compilable con numba)"""
+    conjunta = np.empty((3, 2, 2, 2, 2, 2), dtype=p_pg.dtype)
+    for p in range(3):
+        for g in range(2):
+            for n in range(2):
+                base = p_pg[p] * p_gripe[g, p] * p_neumonia[n, p]
+                for f in range(2):
+                    for t in range(2):
+                        for d in range(2):
+                            conjunta[p, g, n, f, t, d] = (base * p_fiebre[f, g, n]
+                                                          * p_tos[t, n] * p_dolor[d, g])
+    return conjunta
+
+def _sumar_extremos(tabla):
+    """Suma una tabla (antes, estados, después) sobre el primer y el último eje"""
+    resultado = np.zeros(tabla.shape[1], dtype=tabla.dtype)
+    for i in range(tabla.shape[0]):
+        for j in range(tabla.shape[1]):
+            for k in range(tabla.shape[2]):
+                resultado[j] += tabla[i, j, k]
+    return resultado
+
+if njit is not None:
+    _producto_cpts = njit(cache=True, fastmath=True)(_producto_cpts)
+    _sumar_extremos = njit(cache=True)(_sumar_extremos)
+
+# ======================
+# INFERENCIA POR ENUMERACIÓN
+# ======================
+
+def construir_conjunta():
+    """
+    Calcula la distribución conjunta P(PG, Gripe, Neumonia, Fiebre, Tos, Dolor_cabeza)
+    como un arreglo de forma (3, 2, 2, 2, 2, 2), con los ejes en el orden de VARIABLES.
+    """
+    if njit is not None:
+        return _producto_cpts(P_PG, P_GRIPE, P_NEUMONIA, P_FIEBRE, P_TOS, P_DOLOR)
+
+    # Un solo producto sobre las 192 celdas, sin arreglos intermedios
+    conjunta = np.einsum('p,gp,np,fgn,tn,dg->pgnftd',
+                         P_PG, P_GRIPE, P_NEUMONIA, P_FIEBRE, P_TOS, P_DOLOR)
+    return np.ascontiguousarray(conjunta)
+
+def marginales(conjunta, evidencias, consultas):
+    """
+    Devuelve {variable: probabilidades} con la posterior de cada variable de `consultas`
+    dadas las `evidencias` ({variable: estado}).
+    """
+    # Fijar los ejes observados; los ejes libres conservan el orden de VARIABLES
+    indices = tuple(EJES[nombre][1][evidencias[nombre]] if nombre in evidencias else slice(None)
+                    for nombre in VARIABLES)
+    sub = conjunta[indices]
+    libres = [nombre for nombre in VARIABLES if nombre not in evidencias]
+
+    # Posterior conjunta de todas las variables libres, normalizada una sola vez
+    posterior = sub / sub.sum()
+
+    # Marginalizar el resto de variables libres para cada consulta: se ve la posterior
+    # como (ejes anteriores, eje consultado, ejes posteriores) y se suman los extremos
+    resultado = {}
+    for nombre in consultas:
+        eje = libres.index(nombre)
+        tabla = posterior.reshape(int(np.prod(posterior.shape[:eje])), posterior.shape[eje], -1)
+        if njit is not None:
+            resultado[nombre] = _sumar_extremos(tabla)
+        else:
+            resultado[nombre] = tabla.sum(axis=(0, 2))
+    return resultado
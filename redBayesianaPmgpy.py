@@ -1,13 +1,24 @@
+import os
+import threading
+from functools import lru_cache
 from pgmpy.models import BayesianNetwork
 from pgmpy.factors.discrete import TabularCPD
-from pgmpy.inference import VariableElimination
 import numpy as np
-import matplotlib.pyplot as plt
-import networkx as nx
+import cpds
 
 # Configuración inicial
 np.set_printoptions(precision=3, suppress=True)  # Formato de salida numérica
 
+# Posiciones fijas de los nodos para dibujar la red
+_LAYOUT = {
+    'PG': (0, 1),
+    'Gripe': (-1, 0),
+    'Neumonia': (1, 0),
+    'Fiebre': (0, -1),
+    'Tos': (1.5, -0.5),
+    'Dolor_cabeza': (-1.5, -0.5)
+}
+
 # ======================
 # DEFINICIÓN DE LA RED
 # ======================
@@ -22,88 +33,95 @@ def crear_red_pgmpy():
         ('Gripe', 'Dolor_cabeza')
     ])
     
-    # CPDs
+    # CPDs (tablas compartidas en cpds.py)
     cpd_pg = TabularCPD(variable='PG', variable_card=3,
-                        values=[[0.3], [0.4], [0.3]],
-                        state_names={'PG': ['Alta', 'Media', 'Baja']})
+                        values=cpds.P_PG.reshape(3, 1),
+                        state_names={'PG': cpds.ESTADOS['PG']})
 
     cpd_gripe = TabularCPD(variable='Gripe', variable_card=2,
-                           values=[[0.6, 0.4, 0.2],
-                                   [0.4, 0.6, 0.8]],
+                           values=cpds.P_GRIPE,
                            evidence=['PG'], evidence_card=[3],
-                           state_names={'Gripe': ['Sí', 'No'], 'PG': ['Alta', 'Media', 'Baja']})
+                           state_names={v: cpds.ESTADOS[v] for v in ['Gripe', 'PG']})
 
     cpd_neumonia = TabularCPD(variable='Neumonia', variable_card=2,
-                               values=[[0.7, 0.5, 0.3],  # Sí
-                                       [0.3, 0.5, 0.7]], # No
+                               values=cpds.P_NEUMONIA,
                                evidence=['PG'], evidence_card=[3],
-                               state_names={'Neumonia': ['Sí', 'No'], 'PG': ['Alta', 'Media', 'Baja']})
+                               state_names={v: cpds.ESTADOS[v] for v in ['Neumonia', 'PG']})
 
     cpd_fiebre = TabularCPD(variable='Fiebre', variable_card=2,
-                            values=[
-                                [0.9, 0.8, 0.7, 0.1],  # Sí
-                                [0.1, 0.2, 0.3, 0.9]   # No
-                            ],
+                            values=cpds.P_FIEBRE.reshape(2, 4),
                             evidence=['Gripe', 'Neumonia'],
                             evidence_card=[2, 2],
-                            state_names={'Fiebre': ['Sí', 'No'], 'Gripe': ['Sí', 'No'], 'Neumonia': ['Sí', 'No']})
+                            state_names={v: cpds.ESTADOS[v] for v in ['Fiebre', 'Gripe', 'Neumonia']})
 
     cpd_tos = TabularCPD(variable='Tos', variable_card=2,
-                         values=[
-                             [0.8, 0.2],  # Sí
-                             [0.2, 0.8]   # No
-                         ],
+                         values=cpds.P_TOS,
                          evidence=['Neumonia'], evidence_card=[2],
-                         state_names={'Tos': ['Sí', 'No'], 'Neumonia': ['Sí', 'No']})
+                         state_names={v: cpds.ESTADOS[v] for v in ['Tos', 'Neumonia']})
 
     cpd_dolor = TabularCPD(variable='Dolor_cabeza', variable_card=2,
-                           values=[
-                               [0.7, 0.3],  # Sí
-                               [0.3, 0.7]   # No
-                           ],
+                           values=cpds.P_DOLOR,
                            evidence=['Gripe'], evidence_card=[2],
-                           state_names={'Dolor_cabeza': ['Sí', 'No'], 'Gripe': ['Sí', 'No']})
+                           state_names={v: cpds.ESTADOS[v] for v in ['Dolor_cabeza', 'Gripe']})
 
     modelo.add_cpds(cpd_pg, cpd_gripe, cpd_neumonia, cpd_fiebre, cpd_tos, cpd_dolor)
 
-    # Validar modelo
-    assert modelo.check_model()
+    # Validar modelo solo si se pide con BAYES_VALIDATE=1 (se omite con python -O)
+    if __debug__ and os.environ.get('BAYES_VALIDATE'):
+        assert modelo.check_model()
     
     return modelo
 
+# ======================
+# DISTRIBUCIÓN CONJUNTA PRECALCULADA
+# ======================
+
+# La red es fija: se construye una sola vez al importar el módulo
+_MODELO = crear_red_pgmpy()
+_CONJUNTA = cpds.construir_conjunta()
+
+# Variables que se aceptan como evidencia y orden en que se reportan las demás
+_VARIABLES_EVIDENCIA = frozenset(cpds.VARIABLES)
+_ORDEN_DIAGNOSTICO = ('PG', 'Gripe', 'Neumonia', 'Tos', 'Fiebre', 'Dolor_cabeza')
+
 # ======================
 # FUNCIONES DE DIAGNÓSTICO
 # ======================
 
-def diagnosticar_pgmpy(modelo, sintomas):
+@lru_cache(maxsize=512)
+def _consultar(evidencias_congeladas):
+    """
+    Calcula la posterior de las variables no observadas para un conjunto de evidencias
+    (frozenset de pares (variable, estado)). Los resultados quedan en caché.
+    """
+    evidencias = dict(evidencias_congeladas)
+    enfermedades = [nombre for nombre in _ORDEN_DIAGNOSTICO if nombre not in evidencias]
+    posteriores = cpds.marginales(_CONJUNTA, evidencias, enfermedades)
+    return tuple((enf, tuple(posteriores[enf])) for enf in enfermedades)
+
+def diagnosticar_pgmpy(sintomas):
     """
-    Realiza un diagnóstico usando pgmpy basado en los síntomas observados.
+    Realiza un diagnóstico usando la red de pgmpy basado en los síntomas observados.
+    La inferencia se hace por enumeración sobre la distribución conjunta precalculada
+    de la red (ver cpds.marginales).
     """
     try:
         # Convertir nombres y valores observados a evidencia
-        evidencias = {}
-        enfermedades = ['PG','Gripe','Neumonia','Tos','Fiebre','Dolor_cabeza']
-        for nombre, valor in sintomas.items():
-            if nombre in ['Fiebre', 'Tos', 'Dolor_cabeza','Gripe','Neumonia','PG']:
-                evidencias[nombre] = valor
-                enfermedades.remove(nombre)
-
-        # Crear motor de inferencia
-        infer = VariableElimination(modelo)
-
-        # Diccionario para guardar resultados
-        diagnostico = {}
-
-        # Consultar la distribución posterior de cada enfermedad
-        for enf in enfermedades:
-            resultado = infer.query(variables=[enf], evidence=evidencias)
-            diagnostico[enf] = resultado.values  # Esto es un array con las probabilidades
+        evidencias = frozenset((nombre, valor) for nombre, valor in sintomas.items()
+                               if nombre in _VARIABLES_EVIDENCIA)
+
+        # Diccionario con la posterior de cada enfermedad (arrays con las probabilidades)
+        diagnostico = {enf: np.array(probs) for enf, probs in _consultar(evidencias)}
         return diagnostico
 
     except Exception as e:
         print(f"Error en diagnóstico: {str(e)}")
         return None
 
+# Calentar el motor en segundo plano (compilación de numba y caché) mientras
+# el usuario todavía está leyendo o escribiendo
+threading.Thread(target=lambda: diagnosticar_pgmpy({}), daemon=True).start()
+
 def mostrar_diagnostico_pgmpy(diagnostico, estados_posibles):
     """Muestra los resultados del diagnóstico (pgmpy)"""
     print("\n=== RESULTADOS DEL DIAGNÓSTICO ===")
@@ -124,20 +142,22 @@ def main():
     ====================================
     """)
 
-    # 1. Crear la red bayesiana
-    print("Construyendo red bayesiana...")
-    modelo = crear_red_pgmpy()
+    # 1. La red bayesiana se construye al importar el módulo
+    modelo = _MODELO
     print("✅ Red bayesiana creada exitosamente!")
 
     # 2. Visualizar la estructura de la red
     try:
+        # Importaciones diferidas: solo se necesitan para dibujar
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         G = nx.DiGraph()
         edges = list(modelo.edges())
         G.add_edges_from(edges)
 
-        pos = nx.spring_layout(G)
         plt.figure(figsize=(10, 6))
-        nx.draw(G, pos, with_labels=True, node_size=3000,
+        nx.draw(G, _LAYOUT, with_labels=True, node_size=3000,
                 node_color='lightblue', font_size=12,
                 font_weight='bold', arrowsize=20)
         plt.title("Estructura de la Red Bayesiana", fontsize=14)
@@ -145,37 +165,30 @@ def main():
     except Exception as e:
         print(f"⚠️ No se pudo generar el gráfico: {str(e)}")
 
-    # 3. Ejemplo de diagnóstico
-    print("\nEjecutando caso de prueba...")
-
-    print("\nCaso 1: Fiebre='Sí', Tos='Sí', Dolor_cabeza='No'")
-    estados_posibles = {
-        'PG': ['Alta', 'Media', 'Baja'],
-        'Gripe': ['Sí', 'No'],
-        'Neumonia': ['Sí', 'No']
-    }
-    diag = diagnosticar_pgmpy(modelo, {'Fiebre': 'Sí', 'Tos': 'Sí', 'Dolor_cabeza': 'No'})
-    mostrar_diagnostico_pgmpy(diag, estados_posibles)
-
-    print("\nCaso 2: Tos='Sí', Gripe='Sí'")
-    estados_posibles = {
-        'PG': ['Alta', 'Media', 'Baja'],
-        'Neumonia': ['Sí', 'No'],
-        'Fiebre': ['Sí','No'],
-        'Dolor_cabeza': ['Sí', 'No']
-    }
-    diag = diagnosticar_pgmpy(modelo, {'Tos': 'Sí', 'Gripe': 'Sí'})
-    mostrar_diagnostico_pgmpy(diag, estados_posibles)
+    # 3. Ejemplos de diagnóstico
+    _demo()
 
     # 4. Modo interactivo
+    _cli()
+
+def _demo():
+    """Ejecuta los casos de prueba: se calculan todos y luego se muestran en orden"""
+    print("\nEjecutando casos de prueba...")
+
+    casos = [
+        ("Caso 1: Fiebre='Sí', Tos='Sí', Dolor_cabeza='No'", {'Fiebre': 'Sí', 'Tos': 'Sí', 'Dolor_cabeza': 'No'}),
+        ("Caso 2: Tos='Sí', Gripe='Sí'", {'Tos': 'Sí', 'Gripe': 'Sí'})
+    ]
+    diagnosticos = [diagnosticar_pgmpy(sintomas) for _, sintomas in casos]
+
+    for (titulo, _), diag in zip(casos, diagnosticos):
+        print(f"\n{titulo}")
+        mostrar_diagnostico_pgmpy(diag, cpds.ESTADOS)
+
+def _cli():
+    """Modo interactivo: pide los síntomas por consola y muestra el diagnóstico"""
     print("\n=== MODO INTERACTIVO ===")
     print("Ingrese los síntomas del paciente (deje vacío para omitir)")
-    
-    estados_posibles = {
-        'PG': ['Alta', 'Media', 'Baja'],
-        'Gripe': ['Sí', 'No'],
-        'Neumonia': ['Sí', 'No']
-    }
 
     sintomas = {}
     for sintoma in ['Fiebre', 'Tos', 'Dolor_cabeza']:
@@ -184,8 +197,8 @@ def main():
             sintomas[sintoma] = valor
     
     if sintomas:
-        diag = diagnosticar_pgmpy(modelo, sintomas)
-        mostrar_diagnostico_pgmpy(diag, estados_posibles)
+        diag = diagnosticar_pgmpy(sintomas)
+        mostrar_diagnostico_pgmpy(diag, cpds.ESTADOS)
     else:
         print("No se ingresaron síntomas válidos")
 
@@ -1,13 +1,17 @@
 """
 Sistema de Diagnóstico Médico usando Redes Bayesianas con PyMC
 Versión completamente funcional
+
+El diagnóstico se calcula de forma exacta sobre la distribución conjunta
+(la red tiene solo 192 combinaciones); el muestreo MCMC con PyMC queda
+disponible en diagnosticar_mcmc para comparar.
 """
 
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-import networkx as nx
-import arviz as az
 import pymc as pm
+import pytensor.tensor as pt
+import cpds
 
 # Configuración inicial
 np.set_printoptions(precision=3, suppress=True)
@@ -16,63 +20,58 @@ np.set_printoptions(precision=3, suppress=True)
 # DEFINICIÓN DE LA RED
 # ======================
 
+# PG se suma analíticamente: P(PG, Gripe, Neumonia) con la codificación
+# de PyMC (0=No, 1=Sí) para Gripe y Neumonia
+_CONJUNTA_PG = (cpds.P_PG[:, None, None]
+                * cpds.P_GRIPE.T[:, ::-1, None]
+                * cpds.P_NEUMONIA.T[:, None, ::-1])
+_P_GRIPE_NEUMONIA = _CONJUNTA_PG.sum(axis=0)             # (gripe, neumonia)
+_POSTERIOR_PG = _CONJUNTA_PG / _P_GRIPE_NEUMONIA         # P(PG | gripe, neumonia)
+
+# Tablas de P(variable=Sí) con la codificación de PyMC (0=No, 1=Sí),
+# tomadas de cpds.py (donde el estado 0 es 'Sí')
+_P_GRIPE = _P_GRIPE_NEUMONIA[1].sum()                                # P(Gripe=Sí) marginal
+_TABLA_NEUMONIA = pt.as_tensor(_P_GRIPE_NEUMONIA[:, 1] / _P_GRIPE_NEUMONIA.sum(axis=1))  # índice: gripe
+
+# Síntomas: una fila por cada (gripe, neumonia), índice 2*gripe + neumonia,
+# con columnas P(Fiebre=Sí), P(Tos=Sí), P(Dolor_cabeza=Sí)
+_TABLA_SINTOMAS = pt.as_tensor(np.stack([
+    cpds.P_FIEBRE[0, ::-1, ::-1],                                    # depende de gripe y neumonia
+    np.broadcast_to(cpds.P_TOS[0, ::-1][None, :], (2, 2)),           # depende de neumonia
+    np.broadcast_to(cpds.P_DOLOR[0, ::-1][:, None], (2, 2)),         # depende de gripe
+], axis=-1).reshape(4, 3))
+
 def crear_modelo_bayesiano(sintomas_observados=None):
     """
     Crea y devuelve el modelo bayesiano para diagnóstico médico con PyMC
-    Versión completamente funcional
+    Cada probabilidad condicional se obtiene indexando una tabla. La Predisposición
+    Genética (PG) está marginalizada: no se muestrea y se recupera con _POSTERIOR_PG
     """
     with pm.Model() as modelo:
-        # 1. Distribución de probabilidad para Predisposición Genética (PG)
-        pg_probs = np.array([0.3, 0.4, 0.3])  # Alta, Media, Baja
-        pg = pm.Categorical('PG', p=pg_probs)
-        
-        # Gripe dado PG
-        p_gripe = pm.math.switch(
-            pm.math.eq(pg, 0), 0.6,  # PG Alta
-            pm.math.switch(
-                pm.math.eq(pg, 1), 0.4,  # PG Media
-                0.2  # PG Baja
-            )
-        )
-        gripe = pm.Bernoulli('Gripe', p=p_gripe)
+        # Gripe, con PG sumada
+        gripe = pm.Bernoulli('Gripe', p=_P_GRIPE,
+                        observed=sintomas_observados.get('Gripe') if sintomas_observados and 'Gripe' in sintomas_observados else None)
         
-        # Neumonía dado PG
-        p_neumonia = pm.math.switch(
-            pm.math.eq(pg, 0), 0.7,  # PG Alta
-            pm.math.switch(
-                pm.math.eq(pg, 1), 0.5,  # PG Media
-                0.3  # PG Baja
-            )
-        )
-        neumonia = pm.Bernoulli('Neumonia', p=p_neumonia)
+        # Neumonía dado Gripe, con PG sumada
+        p_neumonia = _TABLA_NEUMONIA[gripe]
+        neumonia = pm.Bernoulli('Neumonia', p=p_neumonia,
+                        observed=sintomas_observados.get('Neumonia') if sintomas_observados and 'Neumonia' in sintomas_observados else None)
         
+        # Probabilidades de los tres síntomas con una sola indexación
+        p_sintomas = _TABLA_SINTOMAS[2 * gripe + neumonia]
+
         # Fiebre dado Gripe y Neumonía
-        p_fiebre = pm.math.switch(
-            pm.math.and_(pm.math.eq(gripe, 1), pm.math.eq(neumonia, 1)), 0.9,
-            pm.math.switch(
-                pm.math.and_(pm.math.eq(gripe, 1), pm.math.eq(neumonia, 0)), 0.8,
-                pm.math.switch(
-                    pm.math.and_(pm.math.eq(gripe, 0), pm.math.eq(neumonia, 1)), 0.7,
-                    0.1  # Ninguna
-                )
-            )
-        )
+        p_fiebre = p_sintomas[0]
         fiebre = pm.Bernoulli('Fiebre', p=p_fiebre,
                         observed=sintomas_observados.get('Fiebre') if sintomas_observados and 'Fiebre' in sintomas_observados else None)
 
         # Tos dado Neumonía
-        p_tos = pm.math.switch(
-            pm.math.eq(neumonia, 1), 0.8,  # Neumonía=Sí
-            0.3  # Neumonía=No
-        )
+        p_tos = p_sintomas[1]
         tos = pm.Bernoulli('Tos', p=p_tos,
                         observed=sintomas_observados.get('Tos') if sintomas_observados and 'Tos' in sintomas_observados else None)
 
         # Dolor de cabeza dado Gripe
-        p_dolor = pm.math.switch(
-            pm.math.eq(gripe, 1), 0.7,  # Gripe=Sí
-            0.2  # Gripe=No
-        )
+        p_dolor = p_sintomas[2]
         dolor_cabeza = pm.Bernoulli('Dolor_cabeza', p=p_dolor,
                         observed=sintomas_observados.get('Dolor_cabeza') if sintomas_observados and 'Dolor_cabeza' in sintomas_observados else None)
     
@@ -82,53 +81,112 @@ def crear_modelo_bayesiano(sintomas_observados=None):
 # FUNCIONES DE DIAGNÓSTICO
 # ======================
 
+# La red es fija: la distribución conjunta se calcula una sola vez
+_CONJUNTA = cpds.construir_conjunta()
+
+def _convertir_sintomas(sintomas):
+    """
+    Convierte los síntomas a valores numéricos (1=Sí, 0=No) y devuelve
+    también los valores posibles de las variables no observadas
+    """
+    # Define los valores posibles por variable
+    valores_posibles = {
+        'PG': ['Alta', 'Media', 'Baja'],       # codificados como 0,1,2
+        'Gripe': ['No', 'Sí'],                 # codificados como 0,1
+        'Neumonia': ['No', 'Sí'],              
+        'Fiebre': ['No', 'Sí'],                 
+        'Tos': ['No', 'Sí'],
+        'Dolor_cabeza': ['No', 'Sí']
+    }
+
+    sintomas_numericos = {}
+    for nombre, v in sintomas.items():
+        if v.lower() in ['sí', 'si', 's']:
+            sintomas_numericos[nombre] = 1
+            valores_posibles.pop(nombre, None)
+        elif v.lower() in ['no', 'n']:
+            sintomas_numericos[nombre] = 0
+            valores_posibles.pop(nombre, None)
+
+    return sintomas_numericos, valores_posibles
+
 def diagnosticar(sintomas):
     """
     Realiza un diagnóstico basado en los síntomas observados
-    Versión corregida y funcional
+    Inferencia exacta por enumeración sobre la distribución conjunta
+    """
+    try:
+        sintomas_numericos, valores_posibles = _convertir_sintomas(sintomas)
+        evidencias = {nombre: 'Sí' if v else 'No' for nombre, v in sintomas_numericos.items()}
+
+        # P(enf | evidencias) sumando el resto de ejes de la conjunta
+        posteriores = cpds.marginales(_CONJUNTA, evidencias, list(valores_posibles))
+
+        resultados = {}
+        for enf, probs in posteriores.items():
+            por_estado = dict(zip(cpds.ESTADOS[enf], probs))
+            resultados[enf] = {estado: por_estado[estado] for estado in valores_posibles[enf]}
+
+        return resultados, None
+
+    except Exception as e:
+        print(f"\nError durante el diagnóstico: {str(e)}")
+        print("Posibles causas:")
+        print("- Síntomas no ingresados correctamente (deben ser 'Sí' o 'No')")
+        return None, None
+
+# Calentar la inferencia exacta en segundo plano (compilación de numba)
+# mientras el usuario todavía está leyendo o escribiendo
+threading.Thread(target=lambda: diagnosticar({}), daemon=True).start()
+
+def diagnosticar_mcmc(sintomas):
+    """
+    Realiza un diagnóstico aproximado muestreando el modelo de PyMC
+    Mucho más lento que diagnosticar; útil para contrastar los resultados
     """
     try:
-        # Define los valores posibles por variable
-        valores_posibles = {
-            'PG': ['Alta', 'Media', 'Baja'],       # codificados como 0,1,2
-            'Gripe': ['No', 'Sí'],                 # codificados como 0,1
-            'Neumonia': ['No', 'Sí'],              
-            'Fiebre': ['No', 'Sí'],                 
-            'Tos': ['No', 'Sí'],
-            'Dolor_cabeza': ['No', 'Sí']
-        }
-
-        # Convertir síntomas a valores numéricos (1=Sí, 0=No)
-        sintomas_numericos = {}
-        for nombre, v in sintomas.items():
-            if v.lower() in ['sí', 'si', 's']:
-                sintomas_numericos[nombre] = 1
-                valores_posibles.pop(nombre, None)
-            elif v.lower() in ['no', 'n']:
-                sintomas_numericos[nombre] = 0
-                valores_posibles.pop(nombre, None)
+        sintomas_numericos, valores_posibles = _convertir_sintomas(sintomas)
         
         # Crear modelo con las observaciones
         modelo = crear_modelo_bayesiano(sintomas_numericos)
         
-        # Realizar inferencia con configuración más robusta
-        with modelo:
-            trace = pm.sample(
-                draws=2000,
-                tune=1000,
-                chains=2,
-                return_inferencedata=True,
-                progressbar=True
-            )
+        # Realizar inferencia. Todas las variables libres (Gripe, Neumonía y los síntomas
+        # no ingresados) son Bernoulli, así que se muestrean directamente con Gibbs
+        # (no NUTS ni backends como numpyro) y pocas muestras bastan en una red tan
+        # pequeña. Si todas las variables están observadas no queda nada que muestrear
+        trace = None
+        if modelo.free_RVs:
+            with modelo:
+                paso = pm.BinaryGibbsMetropolis(modelo.free_RVs)
+                trace = pm.sample(
+                    draws=500,
+                    tune=100,
+                    chains=2,
+                    step=paso,
+                    return_inferencedata=True,
+                    progressbar=False
+                )
+
+        def valores(nombre):
+            """Valor observado de la variable, o sus muestras si no es evidencia"""
+            if nombre in sintomas_numericos:
+                return sintomas_numericos[nombre]
+            return trace.posterior[nombre].values.ravel()
     
         # Calcular probabilidades manualmente
         resultados = {}
         for enf in valores_posibles:
-            muestras = trace.posterior[enf].values.flatten()
-            probs = {}
-            for idx, estado in enumerate(valores_posibles[enf]):
-                probs[estado] = np.mean(muestras == idx)
-            resultados[enf] = probs
+            if enf == 'PG':
+                # P(PG | evidencias) = promedio de P(PG | gripe, neumonia) sobre las muestras,
+                # usando el valor observado de Gripe o Neumonía cuando son evidencia
+                probs_pg = _POSTERIOR_PG[:, valores('Gripe'), valores('Neumonia')].reshape(3, -1).mean(axis=1)
+                resultados[enf] = dict(zip(valores_posibles[enf], probs_pg))
+                continue
+
+            muestras = trace.posterior[enf].values.ravel()  # vista, sin copia
+            # Frecuencia de cada estado en una sola pasada
+            conteos = np.bincount(muestras.astype(np.int64, copy=False), minlength=len(valores_posibles[enf]))
+            resultados[enf] = dict(zip(valores_posibles[enf], conteos / conteos.sum()))
 
         return resultados, trace
     
@@ -151,12 +209,19 @@ def mostrar_diagnostico(resultados):
     for nombre_variable, estados in resultados.items():
         print(f"{nombre_variable}:")
         for estado, prob in estados.items():
-            bar = '█' * int(prob * 20)
+            bar = '█' * int(round(prob, 3) * 20)  # misma precisión que se muestra
             print(f"  {estado:<12}: {prob:.3f} |{bar:<20}| {prob * 100:.1f}%")
         print()
 
 def visualizar_red():
     """Visualiza la estructura de la red bayesiana con mejor formato"""
+    # Importaciones diferidas: solo se necesitan para dibujar
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    # Configuración adicional para mejor visualización
+    plt.style.use('seaborn')
+
     G = nx.DiGraph()
     
     # Añadir nodos y conexiones
@@ -204,6 +269,13 @@ def main():
     visualizar_red()
     
     # Casos de prueba demostrativos
+    _demo()
+
+    # Modo interactivo
+    _cli()
+
+def _demo():
+    """Ejecuta los casos de prueba demostrativos"""
     print("\n🔬 Ejecutando casos de prueba demostrativos...")
     
     # Caso 1
@@ -223,9 +295,9 @@ def main():
         mostrar_diagnostico(diag)
     else:
         print("No se pudo realizar el diagnóstico. Verifique los síntomas ingresados.")
-    
-    # Modo interactivo mejorado
-    # 4. Modo interactivo
+
+def _cli():
+    """Modo interactivo: pide los síntomas por consola hasta que el usuario termine"""
     print("\n=== MODO INTERACTIVO ===")
     print("Ingrese los síntomas del paciente (responda 'sí' o 'no' para cada uno)")
     
@@ -253,8 +325,6 @@ def main():
             break
 
 if __name__ == "__main__":
-    # Configuración adicional para mejor visualización
-    plt.style.use('seaborn')
     np.random.seed(42)  # Para reproducibilidad
     
     main()
\ No newline at end of file